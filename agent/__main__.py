@@ -3,13 +3,15 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
-from agent.core import run_scan, build_previews, export_for_web
+from agent.core import run_scan, build_previews, export_for_web, hash_backend, pillow_build_hints
 
 
 
 USAGE = """
 Usage:
   python -m agent scan "<folder_path>" [--out <output_file.jsonl>] [--cache <cache_file.json>]
+      [--jobs <worker_processes>] [--hash sha256|blake3] [--no-inode-sort]
+      [--follow-symlinks]
 
   python -m agent preview "<folder_path>"
       [--index <index_file.jsonl>]
@@ -18,6 +20,7 @@ Usage:
       [--quality <1-100>]
       [--video-crf <int>]
       [--fps-cap <int>]
+      [--jobs <worker_processes>]
 
 Defaults:
   index_file = tripvault_index.jsonl
@@ -27,6 +30,8 @@ Defaults:
   quality    = 80
   video_crf  = 30
   fps_cap    = 24
+  jobs       = number of CPU cores
+  hash       = sha256 (blake3 needs: pip install blake3)
 """.strip()
 
 
@@ -81,6 +86,8 @@ def main(argv: list[str]) -> int:
         folder = Path(argv[2].strip().strip('"'))
         out_file = Path("tripvault_index.jsonl")
         cache_file = Path("tripvault_cache.json")
+        jobs = None
+        hash_algo = "sha256"
 
         if "--out" in argv:
             i = argv.index("--out")
@@ -90,7 +97,30 @@ def main(argv: list[str]) -> int:
             i = argv.index("--cache")
             cache_file = Path(argv[i + 1].strip().strip('"'))
 
-        stats = run_scan(folder, out_file, cache_file)
+        if "--jobs" in argv:
+            i = argv.index("--jobs")
+            jobs = int(argv[i + 1])
+
+        if "--hash" in argv:
+            i = argv.index("--hash")
+            hash_algo = argv[i + 1].strip().lower()
+
+        try:
+            backend = hash_backend(hash_algo)
+        except (ValueError, ImportError) as e:
+            print(e)
+            return 1
+
+        print(f"Hashing with {backend}")
+        stats = run_scan(
+            folder,
+            out_file,
+            cache_file,
+            jobs=jobs,
+            hash_algo=hash_algo,
+            sort_by_inode="--no-inode-sort" not in argv,
+            follow_symlinks="--follow-symlinks" in argv,
+        )
 
         print("\n✔ Scan complete")
         print(f"✔ Files scanned: {stats['scanned']}")
@@ -115,6 +145,7 @@ def main(argv: list[str]) -> int:
         quality = 80
         video_crf = 30
         fps_cap = 24
+        jobs = None
 
         if "--index" in argv:
             i = argv.index("--index")
@@ -140,6 +171,13 @@ def main(argv: list[str]) -> int:
             i = argv.index("--fps-cap")
             fps_cap = int(argv[i + 1])
 
+        if "--jobs" in argv:
+            i = argv.index("--jobs")
+            jobs = int(argv[i + 1])
+
+        for hint in pillow_build_hints():
+            print(f"Hint: {hint}")
+
         stats = build_previews(
             root_folder=folder,
             index_jsonl=index_file,
@@ -148,6 +186,7 @@ def main(argv: list[str]) -> int:
             quality=quality,
             video_crf=video_crf,
             fps_cap=fps_cap,
+            jobs=jobs,
         )
 
         print("\n✔ Preview generation complete")
@@ -2,25 +2,42 @@ from __future__ import annotations
 
 from dataclasses import dataclass, asdict
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
+from fractions import Fraction
+from itertools import islice, repeat
 import mimetypes
-import json
 import hashlib
+import mmap
 import os
+import platform
 import stat
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Iterator, Dict
 
-from PIL import Image, ExifTags, ImageOps
+from PIL import Image, ImageOps, features
+from PIL import __version__ as PIL_VERSION
 import piexif
+import imagesize  # pip install imagesize
 
 from hachoir.metadata import extractMetadata
 from hachoir.parser import createParser
 
 import av  # pip install av
+import orjson  # pip install orjson
 
 
 PHOTO_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff", ".heic", ".heif"}
 VIDEO_EXTS = {".mp4", ".mov", ".mkv", ".avi", ".webm", ".m4v", ".3gp"}
+HASH_ALGOS = ("sha256", "blake3")
+
+# EXIF tag ids we read (0th IFD, plus DateTimeOriginal from the Exif IFD)
+EXIF_MAKE = 271
+EXIF_MODEL = 272
+EXIF_ORIENTATION = 274
+EXIF_DATETIME = 306
+EXIF_DATETIME_ORIGINAL = 36867
 
 
 # -------------------- helpers --------------------
@@ -29,9 +46,44 @@ def iso_utc_from_ts(ts: float) -> str:
     return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
 
 
+def physical_memory_bytes() -> int | None:
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
 def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
     h = hashlib.sha256()
     with path.open("rb") as f:
+        fd = f.fileno()
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+
+        # mmap: one update() straight off the page cache, no per-chunk bytes.
+        # Empty files can't be mapped; files larger than RAM would thrash.
+        # Caveat: if another process (e.g. a sync client) truncates the file
+        # while it is mapped, touching the lost pages raises SIGBUS and kills
+        # the process; in the scan pool that surfaces as BrokenProcessPool.
+        size = os.fstat(fd).st_size
+        ram = physical_memory_bytes()
+        if size > 0 and (ram is None or size <= ram):
+            try:
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    h.update(view)
+                # changed underneath us -> the digest is of neither version; re-read
+                if os.fstat(fd).st_size == size:
+                    return h.hexdigest()
+            except (OSError, ValueError):
+                pass  # some FUSE/SMB mounts can't be mapped (ENODEV/EINVAL): read instead
+            h = hashlib.sha256()
+            f.seek(0)
+
+        if hasattr(hashlib, "file_digest"):  # 3.11+: read loop runs in C
+            return hashlib.file_digest(f, "sha256").hexdigest()
         while True:
             chunk = f.read(chunk_size)
             if not chunk:
@@ -40,6 +92,44 @@ def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
     return h.hexdigest()
 
 
+def blake3_file(path: Path) -> str:
+    from blake3 import blake3  # pip install blake3
+
+    h = blake3(max_threads=blake3.AUTO)
+    h.update_mmap(path)
+    return h.hexdigest()
+
+
+def hash_backend(algo: str = "sha256") -> str:
+    """
+    Human-readable description of what will compute `algo` digests.
+    Raises ValueError for unknown algorithms and ImportError when the backend
+    isn't installed, so callers can fail before any work starts.
+    """
+    if algo not in HASH_ALGOS:
+        raise ValueError(f"Unsupported hash algorithm: {algo} (choose from: {', '.join(HASH_ALGOS)})")
+    if algo == "blake3":
+        try:
+            import blake3  # pip install blake3
+        except ImportError as e:
+            raise ImportError("blake3 hashing needs the blake3 package: pip install blake3") from e
+        return f"blake3 {getattr(blake3, '__version__', '')}".strip()
+    # hashlib's OpenSSL-backed objects come from _hashlib (EVP, SHA-NI when available);
+    # the pure fallback is only used on builds without OpenSSL.
+    if "sha256" in hashlib.algorithms_available and type(hashlib.sha256()).__module__ == "_hashlib":
+        import ssl
+        return f"sha256 via {ssl.OPENSSL_VERSION}"
+    return "sha256 via builtin hashlib (no OpenSSL, slower)"
+
+
+def hash_file(path: Path, algo: str = "sha256") -> str:
+    if algo == "sha256":
+        return sha256_file(path)
+    if algo == "blake3":
+        return blake3_file(path)
+    raise ValueError(f"Unsupported hash algorithm: {algo}")
+
+
 def classify_type(path: Path) -> str | None:
     ext = path.suffix.lower()
     if ext in PHOTO_EXTS:
@@ -56,6 +146,40 @@ def classify_type(path: Path) -> str | None:
     return None
 
 
+def iter_files(folder: str, follow_symlinks: bool = False) -> Iterator[os.DirEntry]:
+    """
+    Regular files under `folder`, in the same order as Path.rglob("*"):
+    a directory's files first, then its subdirectories. Symlinked dirs are
+    only descended into with follow_symlinks (each real dir visited once).
+    DirEntry caches type and stat, so no extra syscalls.
+    """
+    seen: set[tuple[int, int]] = set()  # (st_dev, st_ino) of visited dirs
+
+    def walk(d: str) -> Iterator[os.DirEntry]:
+        try:
+            if follow_symlinks:
+                st = os.stat(d)
+                if (st.st_dev, st.st_ino) in seen:
+                    return
+                seen.add((st.st_dev, st.st_ino))
+            with os.scandir(d) as it:
+                entries = list(it)
+        except PermissionError:
+            return
+
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=follow_symlinks):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry
+
+        for sub in subdirs:
+            yield from walk(sub)
+
+    yield from walk(folder)
+
+
 def should_ignore(path: Path) -> bool:
     name = path.name.lower()
     if name in {".ds_store", "thumbs.db"}:
@@ -89,16 +213,39 @@ def safe_decode(x: Any) -> Any:
     return x
 
 
+@lru_cache(maxsize=8192)  # burst shots share the same second
 def try_parse_exif_datetime(s: str) -> str | None:
     if not s:
         return None
     try:
-        dt = datetime.strptime(s, "%Y:%m:%d %H:%M:%S")
+        # EXIF fixes the layout to "YYYY:MM:DD HH:MM:SS"; slicing skips strptime's
+        # regex and locale machinery. Off-spec strings still go through strptime.
+        digits = s[0:4] + s[5:7] + s[8:10] + s[11:13] + s[14:16] + s[17:19]
+        if (
+            len(s) == 19
+            and s[4] + s[7] + s[10] + s[13] + s[16] == ":: ::"
+            and digits.isascii()
+            and digits.isdigit()
+        ):
+            dt = datetime(
+                int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                int(s[11:13]), int(s[14:16]), int(s[17:19]),
+            )
+        else:
+            dt = datetime.strptime(s, "%Y:%m:%d %H:%M:%S")
         return dt.replace(tzinfo=timezone.utc).isoformat()
     except Exception:
         return None
 
 
+def header_image_size(path: Path) -> tuple[int, int]:
+    """Stored (un-rotated) pixel size read from the file header; (-1, -1) if unknown."""
+    try:
+        return imagesize.get(str(path), exif_rotation=False)
+    except TypeError:  # imagesize < 2.0: no exif_rotation, never rotates
+        return imagesize.get(str(path))
+
+
 def dms_to_deg(dms, ref: str) -> float | None:
     try:
         deg = dms[0][0] / dms[0][1]
@@ -134,41 +281,79 @@ def extract_photo_metadata(path: Path) -> dict:
         "fps": None,
     }
 
-    with Image.open(path) as img:
-        out["width"], out["height"] = img.size
-        exif = img.getexif()
-        if exif:
-            for tag_id, value in exif.items():
-                tag_name = ExifTags.TAGS.get(tag_id, tag_id)
-                if tag_name == "Make":
-                    out["camera_make"] = safe_decode(value)
-                elif tag_name == "Model":
-                    out["camera_model"] = safe_decode(value)
-                elif tag_name == "Orientation":
-                    try:
-                        out["orientation"] = int(value)
-                    except Exception:
-                        pass
-                elif tag_name in ("DateTimeOriginal", "DateTime"):
-                    if out["captured_at"] is None and isinstance(value, str):
-                        out["captured_at"] = try_parse_exif_datetime(value)
-
+    # one EXIF parse: piexif covers JPEG/TIFF/WebP, including the Exif and GPS IFDs
     try:
         exif_dict = piexif.load(str(path))
-        gps = exif_dict.get("GPS", {})
-        if gps:
-            lat = gps.get(piexif.GPSIFD.GPSLatitude)
-            lat_ref = gps.get(piexif.GPSIFD.GPSLatitudeRef)
-            lon = gps.get(piexif.GPSIFD.GPSLongitude)
-            lon_ref = gps.get(piexif.GPSIFD.GPSLongitudeRef)
-
-            if lat and lat_ref and lon and lon_ref:
-                lat_ref = safe_decode(lat_ref)
-                lon_ref = safe_decode(lon_ref)
-                out["gps_lat"] = dms_to_deg(lat, lat_ref)
-                out["gps_lon"] = dms_to_deg(lon, lon_ref)
     except Exception:
-        pass
+        exif_dict = None
+
+    # pixel size straight from the header (SOF / IHDR / VP8), no decoder setup
+    try:
+        width, height = header_image_size(path)
+    except Exception:
+        width, height = -1, -1
+    if width > 0 and height > 0:
+        out["width"], out["height"] = width, height
+
+    # HEIC/HEIF, PNG EXIF and anything else the light readers can't handle -> Pillow
+    if exif_dict is None or out["width"] is None:
+        with Image.open(path) as img:
+            out["width"], out["height"] = img.size
+
+            if exif_dict is None:
+                # Pillow's 0th IFD is all we get for these formats
+                exif = img.getexif()
+                if exif:
+                    for tag_id, value in exif.items():
+                        if tag_id == EXIF_MAKE:
+                            out["camera_make"] = safe_decode(value)
+                        elif tag_id == EXIF_MODEL:
+                            out["camera_model"] = safe_decode(value)
+                        elif tag_id == EXIF_ORIENTATION:
+                            try:
+                                out["orientation"] = int(value)
+                            except Exception:
+                                pass
+                        elif tag_id in (EXIF_DATETIME_ORIGINAL, EXIF_DATETIME):
+                            if out["captured_at"] is None and isinstance(value, str):
+                                out["captured_at"] = try_parse_exif_datetime(value)
+                return out
+
+    ifd0 = exif_dict.get("0th") or {}
+    exif_ifd = exif_dict.get("Exif") or {}
+
+    make = ifd0.get(EXIF_MAKE)
+    if make is not None:
+        out["camera_make"] = safe_decode(make)
+    model = ifd0.get(EXIF_MODEL)
+    if model is not None:
+        out["camera_model"] = safe_decode(model)
+    orientation = ifd0.get(EXIF_ORIENTATION)
+    if orientation is not None:
+        try:
+            out["orientation"] = int(orientation)
+        except Exception:
+            pass
+
+    for dt in (exif_ifd.get(EXIF_DATETIME_ORIGINAL), ifd0.get(EXIF_DATETIME)):
+        dt = safe_decode(dt)
+        if isinstance(dt, str):
+            out["captured_at"] = try_parse_exif_datetime(dt)
+            if out["captured_at"] is not None:
+                break
+
+    gps = exif_dict.get("GPS", {})
+    if gps:
+        lat = gps.get(piexif.GPSIFD.GPSLatitude)
+        lat_ref = gps.get(piexif.GPSIFD.GPSLatitudeRef)
+        lon = gps.get(piexif.GPSIFD.GPSLongitude)
+        lon_ref = gps.get(piexif.GPSIFD.GPSLongitudeRef)
+
+        if lat and lat_ref and lon and lon_ref:
+            lat_ref = safe_decode(lat_ref)
+            lon_ref = safe_decode(lon_ref)
+            out["gps_lat"] = dms_to_deg(lat, lat_ref)
+            out["gps_lon"] = dms_to_deg(lon, lon_ref)
 
     return out
 
@@ -268,7 +453,8 @@ def extract_video_metadata(path: Path) -> dict:
 @dataclass
 class MediaRecord:
     type: str
-    sha256: str
+    sha256: str  # content hash; algorithm is in hash_algo
+    hash_algo: str
 
     relative_path: str
     file_name: str
@@ -315,20 +501,29 @@ def load_cache(cache_path: Path) -> dict:
     if not cache_path.exists():
         return {}
     try:
-        return json.loads(cache_path.read_text(encoding="utf-8"))
+        return orjson.loads(cache_path.read_bytes())
     except Exception:
         return {}
 
 
 def save_cache(cache_path: Path, cache: dict) -> None:
-    cache_path.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+    # compact: the cache is machine-read only, indentation just triples the IO
+    cache_path.write_bytes(orjson.dumps(cache))
 
 
 # -------------------- scan --------------------
 
-def build_record(path: Path, root: Path, media_type: str, sha256: str) -> MediaRecord:
-    st = path.stat()
-    mime, _ = mimetypes.guess_type(str(path))
+def build_record(
+    path: Path,
+    media_type: str,
+    sha256: str,
+    hash_algo: str = "sha256",
+    *,
+    st: os.stat_result,
+    mime: str | None,
+    rel: str,
+) -> MediaRecord:
+    """`st`, `mime` and `rel` come from the scan walk, so nothing is stat'ed twice."""
     uid = getattr(st, "st_uid", None)
     gid = getattr(st, "st_gid", None)
 
@@ -341,11 +536,10 @@ def build_record(path: Path, root: Path, media_type: str, sha256: str) -> MediaR
         if md["captured_at"] is None:
             md["captured_at"] = iso_utc_from_ts(st.st_mtime)
 
-    rel = str(path.resolve().relative_to(root)).replace("\\", "/")
-
     return MediaRecord(
         type=media_type,
         sha256=sha256,
+        hash_algo=hash_algo,
 
         relative_path=rel,
         file_name=path.name,
@@ -387,13 +581,38 @@ def build_record(path: Path, root: Path, media_type: str, sha256: str) -> MediaR
     )
 
 
-def scan_folder_cached(root: Path, cache_path: Path):
+def _hash_and_build(
+    path: Path,
+    media_type: str,
+    hash_algo: str,
+    st: os.stat_result,
+    mime: str | None,
+    rel: str,
+) -> dict:
+    """Worker for the scan pool: hash one file and extract its metadata."""
+    file_hash = hash_file(path, hash_algo)
+    return asdict(build_record(path, media_type, file_hash, hash_algo, st=st, mime=mime, rel=rel))
+
+
+def scan_folder_cached(
+    root: Path,
+    cache_path: Path,
+    jobs: int | None = None,
+    hash_algo: str = "sha256",
+    sort_by_inode: bool = True,
+    follow_symlinks: bool = False,
+):
+    hash_backend(hash_algo)  # unknown algorithm / missing backend: fail before the walk
+
     root = root.resolve()
     if not root.exists():
         raise FileNotFoundError(f"Folder not found: {root}")
     if not root.is_dir():
         raise NotADirectoryError(f"Not a folder: {root}")
 
+    # walked paths are built from the resolved root, so rel is a prefix strip
+    root_prefix = os.path.join(str(root), "")
+
     cache = load_cache(cache_path)
     first_seen_by_hash: dict[str, str] = {}  # sha256 -> relative_path
 
@@ -406,11 +625,12 @@ def scan_folder_cached(root: Path, cache_path: Path):
         "videos": 0,
     }
 
-    records_out = []
+    # walk: consult the cache only, collect misses for hashing
+    records_out: list[dict | None] = []
+    to_hash: list[tuple[int, str, Path, str, os.stat_result, str | None]] = []  # (slot, rel, path, media_type, st, mime)
 
-    for p in root.rglob("*"):
-        if not p.is_file():
-            continue
+    for entry in iter_files(str(root), follow_symlinks=follow_symlinks):
+        p = Path(entry.path)
         if should_ignore(p):
             continue
 
@@ -418,31 +638,60 @@ def scan_folder_cached(root: Path, cache_path: Path):
         if not media_type:
             continue
 
-        rel = str(p.resolve().relative_to(root)).replace("\\", "/")
+        rel = entry.path[len(root_prefix):].replace(os.sep, "/")
         ck = rel
 
-        st = p.stat()
+        st = entry.stat()
         mtime = iso_utc_from_ts(st.st_mtime)
         size = st.st_size
 
         stats["scanned"] += 1
 
         cached = cache.get(ck)
-        if cached and cached.get("size_bytes") == size and cached.get("modified_at_fs") == mtime:
+        if (
+            cached
+            and cached.get("size_bytes") == size
+            and cached.get("modified_at_fs") == mtime
+            and cached.get("hash_algo", "sha256") == hash_algo  # entries predating hash_algo are sha256
+        ):
             rec_dict = cached["record"]
+            rec_dict.setdefault("hash_algo", "sha256")
+            records_out.append(rec_dict)
             stats["from_cache"] += 1
         else:
             stats["rehash"] += 1
-            file_hash = sha256_file(p)
-            rec = build_record(p, root, media_type, file_hash)
-            rec_dict = asdict(rec)
-
-            cache[ck] = {
-                "size_bytes": size,
-                "modified_at_fs": mtime,
-                "record": rec_dict,
-            }
-
+            mime, _ = mimetypes.guess_type(p.name)
+            to_hash.append((len(records_out), rel, p, media_type, st, mime))
+            records_out.append(None)
+
+    # inode order roughly follows on-disk layout: fewer seeks on HDDs, free on SSDs
+    if sort_by_inode:
+        to_hash.sort(key=lambda t: t[4].st_ino)
+
+    # hash + extract cache misses, in parallel across files
+    _, rels, paths, types, sts, mimes = zip(*to_hash) if to_hash else ((),) * 6
+    workers = jobs or os.cpu_count() or 1
+
+    if workers > 1 and len(paths) > 1:
+        chunksize = max(1, len(paths) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            built = list(ex.map(
+                _hash_and_build, paths, types, repeat(hash_algo), sts, mimes, rels, chunksize=chunksize
+            ))
+    else:
+        built = list(map(_hash_and_build, paths, types, repeat(hash_algo), sts, mimes, rels))
+
+    for (slot, ck, *_), rec_dict in zip(to_hash, built):
+        records_out[slot] = rec_dict
+        cache[ck] = {
+            "size_bytes": rec_dict["size_bytes"],
+            "modified_at_fs": rec_dict["modified_at_fs"],
+            "hash_algo": hash_algo,
+            "record": rec_dict,
+        }
+
+    # duplicates are resolved in walk order, exactly as a serial scan would
+    for rec_dict in records_out:
         sha = rec_dict["sha256"]
         if sha in first_seen_by_hash:
             stats["duplicates"] += 1
@@ -456,21 +705,35 @@ def scan_folder_cached(root: Path, cache_path: Path):
         elif rec_dict["type"] == "video":
             stats["videos"] += 1
 
-        records_out.append(rec_dict)
-
-    save_cache(cache_path, cache)
+    # nothing rehashed -> the cache on disk is already current
+    if to_hash or not cache_path.exists():
+        save_cache(cache_path, cache)
     return records_out, stats
 
 
 def write_jsonl_dicts(records: list[dict], output_path: Path) -> None:
     output_path = output_path.resolve()
-    with output_path.open("w", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-
-
-def run_scan(root: Path, output_path: Path, cache_path: Path) -> dict:
-    records, stats = scan_folder_cached(root, cache_path)
+    with output_path.open("wb") as f:
+        f.writelines(orjson.dumps(rec) + b"\n" for rec in records)
+
+
+def run_scan(
+    root: Path,
+    output_path: Path,
+    cache_path: Path,
+    jobs: int | None = None,
+    hash_algo: str = "sha256",
+    sort_by_inode: bool = True,
+    follow_symlinks: bool = False,
+) -> dict:
+    records, stats = scan_folder_cached(
+        root,
+        cache_path,
+        jobs=jobs,
+        hash_algo=hash_algo,
+        sort_by_inode=sort_by_inode,
+        follow_symlinks=follow_symlinks,
+    )
     write_jsonl_dicts(records, output_path)
     return stats
 
@@ -478,12 +741,17 @@ def run_scan(root: Path, output_path: Path, cache_path: Path) -> dict:
 # -------------------- previews --------------------
 
 def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
-    with path.open("r", encoding="utf-8") as f:
+    with path.open("rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
-            yield json.loads(line)
+            yield orjson.loads(line)
+
+
+def _init_preview_worker() -> None:
+    """Load Pillow's format plugins once per pool worker, not per image."""
+    Image.init()
 
 
 def make_webp_preview(
@@ -495,12 +763,11 @@ def make_webp_preview(
     dst_path.parent.mkdir(parents=True, exist_ok=True)
 
     with Image.open(src_path) as img:
+        # JPEG shrink-on-load: libjpeg decodes straight to 1/2, 1/4 or 1/8 scale
+        # while staying >= max_side. No-op for other formats.
+        img.draft("RGB", (max_side, max_side))
         img = ImageOps.exif_transpose(img)
-
-        w, h = img.size
-        scale = min(max_side / max(w, h), 1.0)
-        if scale < 1.0:
-            img = img.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
 
         if img.mode not in ("RGB", "L"):
             img = img.convert("RGB")
@@ -508,6 +775,22 @@ def make_webp_preview(
         img.save(dst_path, format="WEBP", quality=quality, method=6)
 
 
+def pillow_build_hints() -> list[str]:
+    """Warnings about the installed Pillow build that slow down or break previews."""
+    hints = []
+    if not features.check("webp"):
+        hints.append("Pillow has no WebP support; photo previews will fail.")
+    if not features.check_feature("libjpeg_turbo"):
+        hints.append("Pillow is not using libjpeg-turbo; JPEG decode will be slower.")
+    # pillow-simd releases are versioned like 9.5.0.post1
+    if ".post" not in PIL_VERSION and platform.machine().lower() in ("x86_64", "amd64"):
+        hints.append(
+            f"Stock Pillow {PIL_VERSION}; pillow-simd resizes 2-6x faster on x86_64: "
+            "pip uninstall -y pillow && pip install pillow-simd"
+        )
+    return hints
+
+
 def pick_target_height(orig_h: int | None) -> int:
     if not orig_h:
         return 360
@@ -518,24 +801,149 @@ def pick_target_height(orig_h: int | None) -> int:
     return 240
 
 
+# keyframe intervals shorter than this are merged, so all-intra codecs
+# don't turn into one pool task per frame
+VIDEO_INTERVAL_MIN_SEC = 2.0
+# pool workers return whole decoded intervals; longer ones are streamed in-process
+VIDEO_INTERVAL_MAX_BYTES = 64 * 1024 * 1024
+
+
+def keyframe_intervals(keyframe_pts: list[int], time_base, min_sec: float = VIDEO_INTERVAL_MIN_SEC):
+    """
+    Split a stream at keyframes into [start_pts, end_pts) decode intervals.
+    None means "from the beginning" / "to the end".
+    """
+    starts: list[int] = []
+    for pts in sorted(keyframe_pts):
+        if not starts or (pts - starts[-1]) * time_base >= min_sec:
+            starts.append(pts)
+    if not starts:
+        return [(None, None)]
+    ends = starts[1:] + [None]
+    return [(None if i == 0 else start, end) for i, (start, end) in enumerate(zip(starts, ends))]
+
+
+def pack_planes(frame) -> list[bytes]:
+    """8-bit plane bytes of a frame with libav's per-line padding stripped."""
+    out = []
+    for plane in frame.planes:
+        data = bytes(plane)
+        w, ls = plane.width, plane.line_size
+        if ls != w:
+            data = b"".join(data[y * ls:y * ls + w] for y in range(plane.height))
+        out.append(data)
+    return out
+
+
+def unpack_planes(frame, planes: list[bytes]) -> None:
+    """Inverse of pack_planes: fill `frame` honouring its own line padding."""
+    for plane, data in zip(frame.planes, planes):
+        w, ls = plane.width, plane.line_size
+        if ls != w:
+            padded = bytearray(plane.buffer_size)
+            for y in range(plane.height):
+                padded[y * ls:y * ls + w] = data[y * w:(y + 1) * w]
+            data = padded
+        plane.update(data)
+
+
+def iter_interval_frames(
+    src_path: Path,
+    start_pts: int | None,
+    end_pts: int | None,
+    target_w: int,
+    target_h: int,
+    out_fps: float,
+    thread_count: int = 2,
+) -> Iterator["av.VideoFrame"]:
+    """
+    Decode one keyframe-aligned interval of the first video stream, yielding
+    fps-capped yuv420p frames at target size as the filter graph emits them.
+    thread_count=0 lets libav use every core (for when nothing else is decoding).
+    """
+    with av.open(str(src_path), options={"threads": "auto"}) as in_container:
+        vstream = in_container.streams.video[0]
+        vstream.thread_type = "AUTO"
+        vstream.thread_count = thread_count
+
+        if start_pts is not None:
+            in_container.seek(start_pts, stream=vstream)  # lands on the keyframe itself
+
+        # fps cap + resize + pixel format in one libav graph: dropped frames are
+        # never scaled, and there is no separate reformat copy per frame
+        graph = av.filter.Graph()
+        src = graph.add_buffer(template=vstream)
+        fps = graph.add("fps", f"fps={out_fps}")
+        scale = graph.add("scale", f"w={target_w}:h={target_h}:flags=lanczos")
+        fmt = graph.add("format", "yuv420p")
+        sink = graph.add("buffersink")
+        src.link_to(fps)
+        fps.link_to(scale)
+        scale.link_to(fmt)
+        fmt.link_to(sink)
+        graph.configure()
+
+        def drain() -> Iterator["av.VideoFrame"]:
+            while True:
+                try:
+                    yield graph.pull()
+                except (BlockingIOError, EOFError):  # needs more input / flushed
+                    return
+
+        for frame in in_container.decode(vstream):
+            if frame.pts is not None:
+                if start_pts is not None and frame.pts < start_pts:
+                    continue
+                if end_pts is not None and frame.pts >= end_pts:
+                    break
+            graph.push(frame)
+            yield from drain()
+
+        graph.push(None)
+        yield from drain()
+
+
+def decode_interval(
+    src_path: Path,
+    start_pts: int | None,
+    end_pts: int | None,
+    target_w: int,
+    target_h: int,
+    out_fps: float,
+    thread_count: int = 2,
+) -> list[list[bytes]]:
+    """
+    Pool worker: iter_interval_frames collected as packed yuv420p planes.
+    The whole interval is held in memory, so only dispatch intervals that
+    fit VIDEO_INTERVAL_MAX_BYTES.
+    """
+    frames = iter_interval_frames(src_path, start_pts, end_pts, target_w, target_h, out_fps, thread_count)
+    return [pack_planes(frame) for frame in frames]
+
+
 def make_video_preview_pyav(
     src_path: Path,
     dst_path: Path,
     target_h: int,
     crf: int = 30,
     fps_cap: int = 24,
+    jobs: int | None = None,
 ) -> None:
     """
     Video preview using PyAV only (no OS tools).
     Output: MP4 H.264. Audio dropped for MVP stability.
+    Decoding is split at keyframes across worker processes; frames are
+    encoded in order by a single encoder here. Intervals too long to buffer
+    (sparse keyframes) are decoded here and streamed into the encoder.
     """
     dst_path.parent.mkdir(parents=True, exist_ok=True)
 
-    in_container = av.open(str(src_path))
+    in_container = av.open(str(src_path), options={"threads": "auto"})
     vstream = next((s for s in in_container.streams if s.type == "video"), None)
     if vstream is None:
         in_container.close()
         raise RuntimeError("No video stream found")
+    vstream.thread_type = "AUTO"
 
     # detect dimensions
     orig_w = int(vstream.codec_context.width or 0)
@@ -562,32 +970,96 @@ def make_video_preview_pyav(
         in_fps = float(fps_cap)
     out_fps = min(float(fps_cap), in_fps) if in_fps > 0 else float(fps_cap)
 
+    # keyframe positions: demux only, nothing is decoded
+    keyframes: list[int] = []
+    first_pts = last_pts = None
+    for packet in in_container.demux(vstream):
+        if packet.pts is None:
+            continue
+        first_pts = packet.pts if first_pts is None else min(first_pts, packet.pts)
+        last_pts = packet.pts if last_pts is None else max(last_pts, packet.pts)
+        if packet.is_keyframe:
+            keyframes.append(packet.pts)
+    time_base = vstream.time_base
+    in_container.close()
+
+    # decoded size of an interval if a pool worker buffered all of it;
+    # unknown extents count as too big and get streamed
+    frame_bytes = target_w * target_h * 3 // 2
+
+    def fits_buffer(start: int | None, end: int | None) -> bool:
+        start = first_pts if start is None else start
+        end = last_pts if end is None else end
+        if start is None or end is None:
+            return False
+        n_frames = float((end - start) * time_base) * out_fps + 1
+        return n_frames * frame_bytes <= VIDEO_INTERVAL_MAX_BYTES
+
+    intervals = [(s, e, fits_buffer(s, e)) for s, e in keyframe_intervals(keyframes, time_base)]
+
+    out_rate = Fraction(out_fps).limit_denominator(1001)
     out_container = av.open(str(dst_path), mode="w")
-    out_stream = out_container.add_stream("libx264", rate=out_fps)
+    out_stream = out_container.add_stream("libx264", rate=out_rate)
     out_stream.width = target_w
     out_stream.height = target_h
     out_stream.pix_fmt = "yuv420p"
     out_stream.options = {"crf": str(crf), "preset": "veryfast"}
-
-    # simple fps cap by skipping frames (approx)
-    skip = 1
-    if in_fps > out_fps and out_fps > 0:
-        skip = max(1, int(round(in_fps / out_fps)))
-
-    i = 0
-    for frame in in_container.decode(video=0):
-        i += 1
-        if skip > 1 and (i % skip) != 0:
-            continue
-
-        new_frame = frame.reformat(width=target_w, height=target_h, format="yuv420p")
-        for packet in out_stream.encode(new_frame):
+    out_stream.codec_context.thread_type = "AUTO"
+    out_stream.codec_context.thread_count = os.cpu_count() or 0
+
+    n_out = 0
+
+    def encode(frame) -> None:
+        nonlocal n_out
+        frame.pts = n_out
+        frame.time_base = 1 / out_rate
+        frame.pict_type = 0  # NONE: streamed frames keep the decoder's I/P/B, let x264 choose
+        n_out += 1
+        for packet in out_stream.encode(frame):
             out_container.mux(packet)
 
+    def encode_packed(frames: list[list[bytes]]) -> None:
+        for planes in frames:
+            new_frame = av.VideoFrame(target_w, target_h, "yuv420p")
+            unpack_planes(new_frame, planes)
+            encode(new_frame)
+
+    args = (target_w, target_h, out_fps)
+    workers = min(jobs or os.cpu_count() or 1, sum(1 for *_, fits in intervals if fits))
+
+    if workers > 1:
+        # at most `workers` intervals in flight, each within VIDEO_INTERVAL_MAX_BYTES
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            todo = iter(intervals)
+            pending = deque()
+
+            def submit(start, end, fits) -> None:
+                if fits:
+                    pending.append(ex.submit(decode_interval, src_path, start, end, *args))
+                else:
+                    pending.append((start, end))  # streamed here when its turn comes
+
+            for interval in islice(todo, workers):
+                submit(*interval)
+            while pending:
+                job = pending.popleft()
+                nxt = next(todo, None)
+                if nxt is not None:
+                    submit(*nxt)
+                if isinstance(job, tuple):
+                    for frame in iter_interval_frames(src_path, *job, *args):
+                        encode(frame)
+                else:
+                    encode_packed(job.result())
+    else:
+        # nothing is buffered: graph output goes straight into the encoder
+        for s, e, _ in intervals:
+            for frame in iter_interval_frames(src_path, s, e, *args, thread_count=0):
+                encode(frame)
+
     for packet in out_stream.encode():
         out_container.mux(packet)
 
-    in_container.close()
     out_container.close()
 
 
@@ -599,6 +1071,7 @@ def build_previews(
     quality: int = 80,
     video_crf: int = 30,
     fps_cap: int = 24,
+    jobs: int | None = None,
 ) -> dict:
     root_folder = root_folder.resolve()
     index_jsonl = index_jsonl.resolve()
@@ -615,6 +1088,10 @@ def build_previews(
         "last_error": None,
     }
 
+    # photo previews to build: (relative_path, src, dst)
+    photo_jobs: list[tuple[str, Path, Path]] = []
+    queued: set[str] = set()  # duplicates share a sha -> one preview
+
     for rec in iter_jsonl(index_jsonl):
         rtype = rec.get("type")
         rel = rec.get("relative_path")
@@ -629,12 +1106,12 @@ def build_previews(
                 stats["photos_seen"] += 1
                 dst = out_dir / f"{sha}.webp"
 
-                if dst.exists():
+                if sha in queued or dst.exists():
                     stats["photo_previews_skipped"] += 1
                     continue
 
-                make_webp_preview(src, dst, max_side=max_side, quality=quality)
-                stats["photo_previews_created"] += 1
+                queued.add(sha)
+                photo_jobs.append((rel, src, dst))
             elif rtype == "video":
                 # Skipping videos for photo-only MVP
                 stats["videos_seen"] += 1
@@ -671,12 +1148,81 @@ def build_previews(
             stats["errors"] += 1
             stats["last_error"] = f"{rel}: {e}"
 
+    # decode + resize + WebP encode is CPU-bound per image: one process per core
+    workers = jobs or os.cpu_count() or 1
+
+    if workers > 1 and len(photo_jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_preview_worker) as ex:
+            futures = {
+                ex.submit(make_webp_preview, src, dst, max_side, quality): rel
+                for rel, src, dst in photo_jobs
+            }
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                    stats["photo_previews_created"] += 1
+                except Exception as e:
+                    stats["errors"] += 1
+                    stats["last_error"] = f"{futures[fut]}: {e}"
+    else:
+        for rel, src, dst in photo_jobs:
+            try:
+                make_webp_preview(src, dst, max_side=max_side, quality=quality)
+                stats["photo_previews_created"] += 1
+            except Exception as e:
+                stats["errors"] += 1
+                stats["last_error"] = f"{rel}: {e}"
+
     return stats
 
 
 from pathlib import Path
-import json
+import heapq
 import shutil
+import tempfile
+
+# export_for_web sorts in runs of this many items; only one run is in memory
+EXPORT_SORT_CHUNK = 10_000
+
+
+def export_sort_key(item: dict) -> tuple[str, str]:
+    return (item.get("captured_at") or "", item.get("file_name") or "")
+
+
+def write_json_array(path: Path, items: Iterator[dict]) -> None:
+    """Stream `items` to `path` as an indent-2 JSON array, one element at a time."""
+    with path.open("wb") as f:
+        first = True
+        for item in items:
+            f.write(b"[\n  " if first else b",\n  ")
+            f.write(orjson.dumps(item, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  "))
+            first = False
+        f.write(b"[]" if first else b"\n]")
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """
+    Hardlink src to dst, replacing dst; copy instead where links aren't
+    possible (other device, FAT/exFAT, some network shares).
+    Previews are content-addressed and never edited in place, so sharing an
+    inode is safe. Anything that wants to change a file under the exported
+    previews/ must write a new file, not modify the existing one.
+    """
+    try:
+        dst.unlink(missing_ok=True)  # os.link won't replace an existing file
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def file_sizes(folder: Path) -> dict[str, int]:
+    """{name: size} of the regular files directly in `folder`, from one scandir."""
+    try:
+        with os.scandir(folder) as it:
+            return {e.name: e.stat().st_size for e in it if e.is_file()}
+    except FileNotFoundError:
+        return {}
+
 
 def export_for_web(
     index_jsonl: Path,
@@ -687,7 +1233,7 @@ def export_for_web(
     """
     Creates:
       web_public_dir/data.json
-      web_public_dir/previews/<sha>.webp  (copied)
+      web_public_dir/previews/<sha>.webp  (hardlinked, or copied across devices)
     Photo-only export for React gallery.
     """
     index_jsonl = index_jsonl.resolve()
@@ -698,18 +1244,30 @@ def export_for_web(
     out_previews = web_public_dir / "previews"
     out_previews.mkdir(parents=True, exist_ok=True)
 
-    items = []
+    exported = 0
     copied = 0
     missing = 0
 
-    # JSONL -> list of photo items
-    with index_jsonl.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rec = json.loads(line)
+    # one listing per folder instead of exists()/stat() probes per record
+    preview_sizes = file_sizes(previews_dir)
+    exported_sizes = file_sizes(out_previews)
+
+    out_data = web_public_dir / data_filename
+
+    # JSONL -> sorted runs of photo items on disk -> merged into data.json,
+    # sorted by captured_at desc (fallback: file_name)
+    with tempfile.TemporaryDirectory(prefix="tripvault-export-") as tmp:
+        runs: list[Path] = []
+        chunk: list[dict] = []
 
+        def spill() -> None:
+            chunk.sort(key=export_sort_key, reverse=True)
+            run = Path(tmp) / f"run{len(runs)}.jsonl"
+            write_jsonl_dicts(chunk, run)
+            runs.append(run)
+            chunk.clear()
+
+        for rec in iter_jsonl(index_jsonl):
             if rec.get("type") != "photo":
                 continue
 
@@ -718,18 +1276,18 @@ def export_for_web(
                 continue
 
             preview_name = f"{sha}.webp"
-            src_preview = previews_dir / preview_name
+            src_size = preview_sizes.get(preview_name)
 
-            if src_preview.exists():
-                dst_preview = out_previews / preview_name
+            if src_size is not None:
                 # copy if not exists or file size differs
-                if (not dst_preview.exists()) or (dst_preview.stat().st_size != src_preview.stat().st_size):
-                    shutil.copy2(src_preview, dst_preview)
+                if exported_sizes.get(preview_name) != src_size:
+                    link_or_copy(previews_dir / preview_name, out_previews / preview_name)
+                    exported_sizes[preview_name] = src_size
                     copied += 1
             else:
                 missing += 1
 
-            items.append({
+            chunk.append({
                 "sha256": sha,
                 "file_name": rec.get("file_name"),
                 "relative_path": rec.get("relative_path"),
@@ -746,18 +1304,22 @@ def export_for_web(
                 "duplicate_of": rec.get("duplicate_of"),
                 "preview_file": preview_name,
             })
+            exported += 1
+            if len(chunk) >= EXPORT_SORT_CHUNK:
+                spill()
+
+        if runs:
+            if chunk:
+                spill()
+            merged = heapq.merge(*(iter_jsonl(r) for r in runs), key=export_sort_key, reverse=True)
+        else:
+            chunk.sort(key=export_sort_key, reverse=True)
+            merged = iter(chunk)
 
-    # sort by captured_at desc (fallback: file_name)
-    def key_fn(x):
-        ca = x.get("captured_at") or ""
-        return (ca, x.get("file_name") or "")
-    items.sort(key=key_fn, reverse=True)
-
-    out_data = web_public_dir / data_filename
-    out_data.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+        write_json_array(out_data, merged)
 
     return {
-        "photos_exported": len(items),
+        "photos_exported": exported,
         "previews_copied": copied,
         "previews_missing": missing,
         "data_path": str(out_data),